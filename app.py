@@ -18,19 +18,25 @@ Objective:
 """
 
 import os
+import io
+import csv
+import atexit
 import json
+import threading
+import numpy as np
 import pandas as pd
 import streamlit as st
 from datetime import datetime
 from streamlit_option_menu import option_menu
 from bank_py import bank_details
-from config import STOCKS_FILE, CSV_FILE, TRANSACTION_LOG_FILE
+from utils import read_csv_cached, read_parquet_cached
+from config import STOCKS_FILE, PORTFOLIO_FILE, TRANSACTION_LOG_FILE
 
 # Page configuration
 st.set_page_config(page_title="Stock Portfolio Manager", page_icon="📊", layout="wide")
 
 # Custom styling
-st.markdown("""
+CUSTOM_CSS = """
     <style>
     .stButton>button {
         width: 100%;
@@ -60,10 +66,11 @@ st.markdown("""
         font-weight: bold;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Footer with developer details
-st.markdown("""
+FOOTER_HTML = """
     <style>
     .footer {
         position: fixed;
@@ -81,7 +88,17 @@ st.markdown("""
         <p>Developed by <a href="https://iamshobhitagarwal.medium.com/" target="_blank">Shobhit Agarwal</a> | 
         <a href="https://github.com/shobhitag11" target="_blank">GitHub</a></p>
     </div>
-""", unsafe_allow_html=True)
+"""
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+
+# Sidebar navigation menu configuration
+MENU_CFG = dict(
+    menu_title="Market Menu",
+    options=["Stock Operations", "Bank Details"],
+    icons=["pencil-square", "bank"],
+    menu_icon="cast",
+    default_index=0,
+)
 
 
 # Initialize or load stocks list from JSON
@@ -114,13 +131,21 @@ def save_stocks(stocks_data):
     with open(STOCKS_FILE, 'w') as f:
         json.dump(stocks_data, f, indent=4)
 
+# Columns of the transaction log CSV, in file order
+TRANSACTION_LOG_COLUMNS = ["Date Time", "Stock", "Action", "Quantity", "Share Price", "Total Value", "Broker"]
+
 # Initialize transaction log CSV if not exists
 if not os.path.exists(TRANSACTION_LOG_FILE):
-    transaction_log_columns = ["Date Time", "Stock", "Action", "Quantity", "Share Price", "Total Value", "Broker"]
-    pd.DataFrame(columns=transaction_log_columns).to_csv(TRANSACTION_LOG_FILE, index=False)
+    pd.DataFrame(columns=TRANSACTION_LOG_COLUMNS).to_csv(TRANSACTION_LOG_FILE, index=False)
+
+# Load stocks data once per session; reruns reuse the parsed dict
+if "stocks_data" not in st.session_state:
+    st.session_state["stocks_data"] = load_stocks()
+stocks_data = st.session_state["stocks_data"]
 
-# Load stocks data
-stocks_data = load_stocks()
+# Set of known stock symbols for constant-time duplicate checks
+if "symbols_set" not in st.session_state:
+    st.session_state["symbols_set"] = {stock["symbol"] for stock in stocks_data["stocks"]}
 
 # Placeholder for stock database with improved fields
 data = {
@@ -140,13 +165,232 @@ data = {
     'Realized P/L': [],
     'Unrealized P/L': []
 }
-df = pd.DataFrame(data)
+# Number of portfolio updates to apply before rewriting the portfolio snapshot
+SNAPSHOT_INTERVAL = 20
+
+# Brokers available for stock transactions
+BROKERS = ["Zerodha", "Fyers"]
+
+# Numeric portfolio columns, fixed by the portfolio schema
+NUMERIC_COLS = [
+    'Buy Quantity', 'Buy Price', 'Total Buy Value', 'Sell Quantity', 'Sell Price', 'Total Sell Value',
+    'Current Quantity', 'Average Buy Price', 'Total Investment', 'Market Value', 'Realized P/L', 'Unrealized P/L'
+]
+
+# Display format for each numeric portfolio column
+PORTFOLIO_FORMATTERS = {
+    col: "{:,.0f}" if 'Quantity' in col else "\u20b9{:,.2f}" for col in NUMERIC_COLS
+}
+
+# Low-cardinality transaction log columns stored as categoricals
+TRANSACTION_LOG_DTYPES = {"Stock": "category", "Action": "category", "Broker": "category"}
+
+# Function to set categorical dtypes on the portfolio
+def set_categorical_dtypes(portfolio_df):
+    """
+    Store the repeated Stock and Broker strings of the portfolio as categoricals, in place.
+    """
+    portfolio_df['Stock'] = portfolio_df['Stock'].astype('category')
+    portfolio_df['Broker'] = pd.Categorical(portfolio_df['Broker'], categories=BROKERS)
+
+# Function to append a position to the portfolio
+def append_position(portfolio_df, row):
+    """
+    Append a row to the portfolio in place, keeping Stock and Broker categorical.
+    Row enlargement falls back to object dtype, so both columns are rebuilt from their
+    existing codes plus the new row's code instead of re-encoding every value.
+    """
+    categoricals = {}
+    for col in ('Stock', 'Broker'):
+        column = portfolio_df[col]
+        if row[col] not in column.cat.categories:
+            column = column.cat.add_categories([row[col]])
+        codes = np.append(column.cat.codes.to_numpy(), column.cat.categories.get_loc(row[col]))
+        categoricals[col] = pd.Categorical.from_codes(codes, dtype=column.dtype)
+    portfolio_df.loc[len(portfolio_df)] = row
+    for col, values in categoricals.items():
+        portfolio_df[col] = values
+
+# Function to apply a transaction to the portfolio
+def apply_transaction(portfolio_df, position_index, stock_symbol, quantity, share_price, action, broker, current_date):
+    """
+    Apply a buy/sell operation to the portfolio DataFrame in place.
+    Return an error message if the operation cannot be applied, otherwise None.
+    """
+    stock_index = position_index.get((stock_symbol, broker))
 
-# Load existing data if the CSV file exists
-try:
-    df = pd.read_csv(CSV_FILE)
-except FileNotFoundError:
-    df.to_csv(CSV_FILE, index=False)
+    if action == "Buy":
+        if stock_index is not None:
+            # Update existing row for the stock with the same broker
+            current_quantity = portfolio_df.at[stock_index, 'Current Quantity']
+            current_total_investment = portfolio_df.at[stock_index, 'Total Investment']
+
+            new_quantity = current_quantity + quantity
+            new_total_investment = current_total_investment + (quantity * share_price)
+            new_avg_price = new_total_investment / new_quantity
+            new_buy_quantity = portfolio_df.at[stock_index, 'Buy Quantity'] + quantity
+            new_total_buy_value = portfolio_df.at[stock_index, 'Total Buy Value'] + quantity * share_price
+            new_market_value = new_quantity * share_price
+
+            portfolio_df.loc[stock_index, [
+                'Date', 'Buy Quantity', 'Buy Price', 'Total Buy Value', 'Current Quantity',
+                'Average Buy Price', 'Total Investment', 'Market Value', 'Unrealized P/L'
+            ]] = [
+                current_date, new_buy_quantity, share_price, new_total_buy_value, new_quantity,
+                new_avg_price, new_total_investment, new_market_value, new_market_value - new_total_investment
+            ]
+        else:
+            # Add new row for the stock with the different broker
+            append_position(portfolio_df, {
+                'Stock': stock_symbol,
+                'Broker': broker,
+                'Date': current_date,
+                'Buy Quantity': quantity,
+                'Buy Price': share_price,
+                'Total Buy Value': quantity * share_price,
+                'Sell Quantity': 0,
+                'Sell Price': 0,
+                'Total Sell Value': 0,
+                'Current Quantity': quantity,
+                'Average Buy Price': share_price,
+                'Total Investment': quantity * share_price,
+                'Market Value': quantity * share_price,
+                'Realized P/L': 0.0,
+                'Unrealized P/L': 0.0
+            })
+            position_index[(stock_symbol, broker)] = len(portfolio_df) - 1
+
+    elif action == "Sell":
+        if stock_index is not None:
+            # Update the row for the stock with the same broker
+            current_quantity = portfolio_df.at[stock_index, 'Current Quantity']
+            avg_buy_price = portfolio_df.at[stock_index, 'Average Buy Price']
+
+            if current_quantity >= quantity:
+                realized_pl = (share_price - avg_buy_price) * quantity
+                remaining_quantity = current_quantity - quantity
+
+                new_sell_quantity = portfolio_df.at[stock_index, 'Sell Quantity'] + quantity
+                new_total_sell_value = portfolio_df.at[stock_index, 'Total Sell Value'] + quantity * share_price
+                new_realized_pl = portfolio_df.at[stock_index, 'Realized P/L'] + realized_pl
+
+                portfolio_df.loc[stock_index, [
+                    'Date', 'Sell Quantity', 'Sell Price', 'Total Sell Value', 'Current Quantity',
+                    'Realized P/L', 'Market Value', 'Unrealized P/L', 'Total Investment'
+                ]] = [
+                    current_date, new_sell_quantity, share_price, new_total_sell_value, remaining_quantity,
+                    new_realized_pl, remaining_quantity * share_price,
+                    remaining_quantity * (share_price - avg_buy_price), remaining_quantity * avg_buy_price
+                ]
+            else:
+                return "Insufficient quantity to sell for the selected broker!"
+        else:
+            return "Stock not found in your portfolio for the selected broker!"
+
+    return None
+
+# Function to save the portfolio snapshot
+def save_portfolio(portfolio_df, log_offset):
+    """
+    Write the full portfolio to the Parquet snapshot file, recording the transaction log offset it reflects.
+    """
+    # pandas stores attrs in the Parquet metadata and restores them on read
+    portfolio_df.attrs["log_offset"] = log_offset
+    portfolio_df.to_parquet(PORTFOLIO_FILE, engine="pyarrow", compression="snappy", index=False)
+
+# Function to apply logged transactions to the portfolio
+def replay_transaction_log(portfolio_df, position_index, log_offset):
+    """
+    Apply the transactions logged after the given byte offset to the portfolio in place.
+    Return the offset of the end of the log. Offset 0 replays the whole log, header included.
+    """
+    with open(TRANSACTION_LOG_FILE, 'rb') as f:
+        f.seek(log_offset)
+        log_tail = f.read()
+    if not log_tail:
+        return log_offset
+    log_df = pd.read_csv(
+        io.BytesIO(log_tail), header=0 if log_offset == 0 else None,
+        names=TRANSACTION_LOG_COLUMNS, dtype=TRANSACTION_LOG_DTYPES
+    )
+    for date_time, stock_symbol, action, quantity, share_price, broker in log_df[
+        ["Date Time", "Stock", "Action", "Quantity", "Share Price", "Broker"]
+    ].itertuples(index=False):
+        apply_transaction(portfolio_df, position_index, stock_symbol, quantity, share_price, action, broker, date_time[:10])
+    return log_offset + len(log_tail)
+
+# Function to index portfolio positions
+def build_position_index(portfolio_df):
+    """
+    Return the row index of each (stock, broker) position for constant-time lookups.
+    """
+    return {(stock, broker): index for index, stock, broker in portfolio_df[['Stock', 'Broker']].itertuples()}
+
+# Lock serializing transaction log reads, appends and snapshot writes across sessions
+@st.cache_resource
+def _log_lock():
+    return threading.RLock()
+
+# Function to load the portfolio
+def load_portfolio():
+    """
+    Load the portfolio snapshot and apply the transactions logged after it, saving the snapshot if it was behind.
+    Return the portfolio and the transaction log offset it reflects.
+    """
+    with _log_lock():
+        log_offset = 0
+        if os.path.exists(PORTFOLIO_FILE):
+            portfolio_df = read_parquet_cached(PORTFOLIO_FILE)
+            # Snapshots without a recorded offset are rebuilt from the whole log
+            log_offset = portfolio_df.attrs.get("log_offset", 0)
+        if log_offset == 0:
+            portfolio_df = pd.DataFrame(data)
+        set_categorical_dtypes(portfolio_df)
+        new_log_offset = replay_transaction_log(portfolio_df, build_position_index(portfolio_df), log_offset)
+        if new_log_offset != log_offset:
+            save_portfolio(portfolio_df, new_log_offset)
+    return portfolio_df, new_log_offset
+
+# Function to save the snapshot on shutdown
+def save_portfolio_on_exit():
+    """
+    Bring the portfolio snapshot up to date with the transaction log.
+    The log is the shared record of every session's trades, so the snapshot is caught up from it
+    rather than from any one session's in-memory portfolio.
+    """
+    load_portfolio()
+
+# Register the shutdown snapshot once per process rather than once per session
+@st.cache_resource
+def _register_exit_snapshot():
+    atexit.register(save_portfolio_on_exit)
+    return True
+
+_register_exit_snapshot()
+
+# Function to catch up with trades logged by other sessions
+def sync_portfolio_with_log():
+    """
+    Apply the transactions other sessions logged since this session's portfolio was last updated.
+    """
+    with _log_lock():
+        log_offset = replay_transaction_log(
+            st.session_state["portfolio_df"], st.session_state["position_index"], st.session_state["log_offset"]
+        )
+    if log_offset != st.session_state["log_offset"]:
+        st.session_state["log_offset"] = log_offset
+        # Positions may have been added, rebuild the broker groups on the next filter
+        st.session_state.pop("broker_groups", None)
+
+# Load the portfolio once per session; updates are applied to it in memory
+if "portfolio_df" not in st.session_state:
+    portfolio_df, log_offset = load_portfolio()
+    st.session_state["portfolio_df"] = portfolio_df
+    st.session_state["position_index"] = build_position_index(portfolio_df)
+    st.session_state["log_offset"] = log_offset
+    st.session_state["writes_since_snapshot"] = 0
+sync_portfolio_with_log()
+df = st.session_state["portfolio_df"]
 
 # Initialize session state
 if "selected_stock" not in st.session_state:
@@ -158,34 +402,45 @@ if "stock_broker_mapping" not in st.session_state:
 # Function to add new stock
 def add_new_stock(symbol, name):
     """
-    Add a new stock to the stocks data and save it to the JSON file.
+    Add a new stock to the cached stocks data and save it to the JSON file.
     """
+    stocks_data = st.session_state["stocks_data"]
     stocks_data['stocks'].append({
         "symbol": symbol.upper(),
         "name": name
     })
     save_stocks(stocks_data)
+    st.session_state["symbols_set"].add(symbol.upper())
     return True
 
 # Function to log transactions
-def log_transaction(stock_symbol, action, quantity, share_price, broker):
+def log_transaction(stock_symbol, action, quantity, share_price, broker, current_datetime):
     """
     Log a transaction (buy/sell) to the transaction log CSV file.
     """
-    current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     total_value = quantity * share_price
-    log_entry = {
-        "Date Time": current_datetime,
-        "Stock": stock_symbol,
-        "Action": action,
-        "Quantity": quantity,
-        "Share Price": share_price,
-        "Total Value": total_value,
-        "Broker": broker
-    }
-    # Append log to CSV
-    log_df = pd.DataFrame([log_entry])
-    log_df.to_csv(TRANSACTION_LOG_FILE, mode='a', header=False, index=False)
+    # Append log row to CSV, in the same column order as the header
+    with open(TRANSACTION_LOG_FILE, 'a', newline='') as f:
+        csv.writer(f, lineterminator=os.linesep).writerow(
+            [current_datetime, stock_symbol, action, quantity, share_price, total_value, broker]
+        )
+
+# Function to group portfolio rows by broker
+def _broker_groups(df):
+    """
+    Return a mapping of broker to row positions, computed once and cached in session state.
+    """
+    if "broker_groups" not in st.session_state:
+        st.session_state["broker_groups"] = df.groupby("Broker", observed=True).indices
+    return st.session_state["broker_groups"]
+
+# Function to group transaction log rows by broker, once per version of the log
+@st.cache_data(show_spinner=False, max_entries=2)
+def _log_broker_groups(_transaction_log_df, mtime_ns, size):
+    """
+    Return a mapping of broker to transaction log row positions, computed once per version of the log file.
+    """
+    return _transaction_log_df.groupby("Broker", observed=True).indices
 
 # Function to filter data by broker
 def filter_by_broker():
@@ -193,9 +448,10 @@ def filter_by_broker():
     Filter the stock data by the selected broker.
     """
     global df
-    selected_broker = st.selectbox("Filter by Broker", options=["All Brokers"] + list(df["Broker"].unique()))
+    # Broker is a categorical over BROKERS, so the options need no scan of the data
+    selected_broker = st.selectbox("Filter by Broker", options=["All Brokers"] + BROKERS)
     if selected_broker != "All Brokers":
-        filtered_df = df[df["Broker"] == selected_broker]
+        filtered_df = df.take(_broker_groups(df).get(selected_broker, []))
     else:
         filtered_df = df
     return filtered_df
@@ -205,95 +461,35 @@ def update_database(stock_symbol, stock_name, quantity, share_price, action, bro
     """
     Update the stock database with buy/sell operations and log the transaction.
     """
-    global df
-    current_date = datetime.now().strftime("%Y-%m-%d")
-
-    # Check if stock with the same broker exists
-    stock_exists_with_broker = (
-        (df['Stock'] == stock_symbol) & (df['Broker'] == broker)
-    ).any()
+    current_datetime = datetime.now().isoformat(sep=" ", timespec="seconds")
+    current_date = current_datetime[:10]
 
-    if action == "Buy":
-        if stock_exists_with_broker:
-            # Update existing row for the stock with the same broker
-            stock_index = df[(df['Stock'] == stock_symbol) & (df['Broker'] == broker)].index[0]
-            current_quantity = df.at[stock_index, 'Current Quantity']
-            current_total_investment = df.at[stock_index, 'Total Investment']
-
-            new_quantity = current_quantity + quantity
-            new_total_investment = current_total_investment + (quantity * share_price)
-            new_avg_price = new_total_investment / new_quantity
+    position_index = st.session_state["position_index"]
 
-            df.at[stock_index, 'Date'] = current_date
-            df.at[stock_index, 'Buy Quantity'] += quantity
-            df.at[stock_index, 'Buy Price'] = share_price
-            df.at[stock_index, 'Total Buy Value'] += quantity * share_price
-            df.at[stock_index, 'Current Quantity'] = new_quantity
-            df.at[stock_index, 'Average Buy Price'] = new_avg_price
-            df.at[stock_index, 'Total Investment'] = new_total_investment
-            df.at[stock_index, 'Market Value'] = new_quantity * share_price
-            df.at[stock_index, 'Unrealized P/L'] = (
-                df.at[stock_index, 'Market Value'] - df.at[stock_index, 'Total Investment']
-            )
-        else:
-            # Add new row for the stock with the different broker
-            new_entry = pd.DataFrame({
-                'Stock': [stock_symbol],
-                'Broker': [broker],
-                'Date': [current_date],
-                'Buy Quantity': [quantity],
-                'Buy Price': [share_price],
-                'Total Buy Value': [quantity * share_price],
-                'Sell Quantity': [0],
-                'Sell Price': [0],
-                'Total Sell Value': [0],
-                'Current Quantity': [quantity],
-                'Average Buy Price': [share_price],
-                'Total Investment': [quantity * share_price],
-                'Market Value': [quantity * share_price],
-                'Realized P/L': [0.0],
-                'Unrealized P/L': [0.0]
-            })
-            df = pd.concat([df, new_entry], ignore_index=True)
-
-        log_transaction(stock_symbol, action, quantity, share_price, broker)
+    # Hold the log lock so no other session appends between catching up and logging this update
+    with _log_lock():
+        # Validate against trades other sessions logged since this run started
+        sync_portfolio_with_log()
+        is_new_position = (stock_symbol, broker) not in position_index
 
-    elif action == "Sell":
-        if stock_exists_with_broker:
-            # Update the row for the stock with the same broker
-            stock_index = df[(df['Stock'] == stock_symbol) & (df['Broker'] == broker)].index[0]
-            current_quantity = df.at[stock_index, 'Current Quantity']
-            avg_buy_price = df.at[stock_index, 'Average Buy Price']
+        error = apply_transaction(df, position_index, stock_symbol, quantity, share_price, action, broker, current_date)
+        if error:
+            st.sidebar.error(error)
+            return False
 
-            if current_quantity >= quantity:
-                realized_pl = (share_price - avg_buy_price) * quantity
-                remaining_quantity = current_quantity - quantity
+        log_transaction(stock_symbol, action, quantity, share_price, broker, current_datetime)
+        st.session_state["log_offset"] = os.path.getsize(TRANSACTION_LOG_FILE)
 
-                df.at[stock_index, 'Date'] = current_date
-                df.at[stock_index, 'Sell Quantity'] += quantity
-                df.at[stock_index, 'Sell Price'] = share_price
-                df.at[stock_index, 'Total Sell Value'] += quantity * share_price
-                df.at[stock_index, 'Current Quantity'] = remaining_quantity
-                df.at[stock_index, 'Realized P/L'] += realized_pl
-
-                df.at[stock_index, 'Market Value'] = remaining_quantity * share_price
-                df.at[stock_index, 'Unrealized P/L'] = (
-                    remaining_quantity * (share_price - avg_buy_price)
-                )
-
-                df.at[stock_index, 'Total Investment'] = (
-                    remaining_quantity * avg_buy_price
-                )
-            else:
-                st.sidebar.error("Insufficient quantity to sell for the selected broker!")
-                return False
-        else:
-            st.sidebar.error("Stock not found in your portfolio for the selected broker!")
-            return False
+        # The transaction log records this update, the snapshot is only rewritten every few updates
+        st.session_state["writes_since_snapshot"] += 1
+        if st.session_state["writes_since_snapshot"] >= SNAPSHOT_INTERVAL:
+            save_portfolio(df, st.session_state["log_offset"])
+            st.session_state["writes_since_snapshot"] = 0
 
-        log_transaction(stock_symbol, action, quantity, share_price, broker)
+    if is_new_position:
+        # Row positions per broker changed, rebuild them on the next filter
+        st.session_state.pop("broker_groups", None)
 
-    df.to_csv(CSV_FILE, index=False)
     st.session_state["stock_broker_mapping"][stock_symbol] = broker
     return True
 
@@ -302,7 +498,6 @@ def stock_operations():
     Handle stock operations including adding new stocks, buying, and selling stocks.
     Display portfolio metrics and transaction logs.
     """
-    global stocks_data
     st.title("📊 Stock Portfolio Manager")
 
     filtered_df = filter_by_broker()
@@ -312,17 +507,20 @@ def stock_operations():
 
     # Calculate and display portfolio metrics
     if not filtered_df.empty:
+        # Sum all metric columns in a single reduction over one 2D block
+        total_investment, total_market_value, realized_pl, unrealized_pl = filtered_df[
+            ['Total Investment', 'Market Value', 'Realized P/L', 'Unrealized P/L']
+        ].to_numpy().sum(axis=0)
+
         with col1:
-            total_investment = filtered_df['Total Investment'].sum()
             st.markdown(f"<span class='metric-neutral'>Total Investment: \u20b9{total_investment:,.2f}</span>", unsafe_allow_html=True)
 
         with col2:
-            total_market_value = filtered_df['Market Value'].sum()
             market_value_class = "metric-dark-green" if total_market_value >= total_investment else "metric-dark-red"
             st.markdown(f"<span class='{market_value_class}'>Current Market Value: \u20b9{total_market_value:,.2f}</span>", unsafe_allow_html=True)
 
         with col3:
-            total_pl = filtered_df['Realized P/L'].sum() + filtered_df['Unrealized P/L'].sum()
+            total_pl = realized_pl + unrealized_pl
             pl_class = "metric-positive" if total_pl >= 0 else "metric-negative"
             st.markdown(f"<span class='{pl_class}'>Total P/L: \u20b9{total_pl:,.2f}</span>", unsafe_allow_html=True)
 
@@ -335,12 +533,11 @@ def stock_operations():
 
             if st.button("Add Stock"):
                 if new_stock_symbol and new_stock_name:
-                    if any(stock["symbol"] == new_stock_symbol for stock in stocks_data["stocks"]):
+                    if new_stock_symbol in st.session_state["symbols_set"]:
                         st.error("Stock symbol already exists!")
                     else:
                         if add_new_stock(new_stock_symbol, new_stock_name):
                             st.success(f"Added {new_stock_symbol} to the stock list")
-                            stocks_data = load_stocks()
                 else:
                     st.error("Please enter both symbol and name")
 
@@ -359,7 +556,7 @@ def stock_operations():
 
         disable_inputs = selected_stock_symbol == "Select a stock"
 
-        broker = st.radio("Select Broker", ["Zerodha", "Fyers"], index=0 if st.session_state["stock_broker_mapping"].get(selected_stock_symbol) == "Zerodha" else 1, disabled=disable_inputs)
+        broker = st.radio("Select Broker", BROKERS, index=0 if st.session_state["stock_broker_mapping"].get(selected_stock_symbol) == "Zerodha" else 1, disabled=disable_inputs)
 
         quantity = st.number_input("Enter Quantity", min_value=1, value=1, step=1, disabled=disable_inputs)
 
@@ -390,22 +587,25 @@ def stock_operations():
     # Main content area
     st.subheader("Your Stock Portfolio")
     if not filtered_df.empty:
-        display_df = filtered_df.copy()
-        numeric_columns = display_df.select_dtypes(include=['float64', 'int64']).columns
-        for col in numeric_columns:
-            display_df[col] = display_df[col].apply(lambda x: f"\u20b9{x:,.2f}" if 'Price' in col or 'Value' in col or 'P/L' in col or 'Investment' in col else f"{x:,.0f}" if 'Quantity' in col else x)
-
-        st.dataframe(display_df.sort_values('Date', ascending=False), use_container_width=True, height=400, hide_index=True)
+        display_df = filtered_df.sort_values('Date', ascending=False)
+        # Format numeric columns at render time so the data keeps its numeric dtypes
+        st.dataframe(display_df.style.format(PORTFOLIO_FORMATTERS), use_container_width=True, height=400, hide_index=True)
     else:
         st.info("Your portfolio is empty. Start by adding some stocks!")
 
     with st.expander("Transaction Log"):
         if os.path.exists(TRANSACTION_LOG_FILE):
-            transaction_log_df = pd.read_csv(TRANSACTION_LOG_FILE)
-            filtered_logs = transaction_log_df[transaction_log_df["Broker"].isin(filtered_df["Broker"].unique())]
+            # One stat keys both caches, so the groups always match the frame they index
+            log_stat = os.stat(TRANSACTION_LOG_FILE)
+            transaction_log_df = read_csv_cached(TRANSACTION_LOG_FILE, dtype=TRANSACTION_LOG_DTYPES, stat=log_stat)
+            log_groups = _log_broker_groups(transaction_log_df, log_stat.st_mtime_ns, log_stat.st_size)
+            positions = [log_groups[b] for b in filtered_df["Broker"].unique() if b in log_groups]
+            # Merge the positions of the selected brokers back into log order
+            filtered_logs = transaction_log_df.take(np.sort(np.concatenate(positions)) if positions else [])
 
             st.dataframe(
-                filtered_logs.sort_values("Date Time", ascending=False),
+                # Rows are appended in time order, so newest first is a reversed view
+                filtered_logs.iloc[::-1],
                 use_container_width=True,
                 height=300,
                 hide_index=True
@@ -418,13 +618,7 @@ def main_screen():
     Main screen to navigate between stock operations and bank details.
     """
     with st.sidebar:
-        selected_page = option_menu(
-            "Market Menu",
-            ["Stock Operations", "Bank Details"],
-            icons=["pencil-square", "bank"],
-            menu_icon="cast",
-            default_index=0,
-        )
+        selected_page = option_menu(**MENU_CFG)
     if selected_page == "Stock Operations":
         stock_operations()
     elif selected_page == "Bank Details":
@@ -1,22 +1,25 @@
 import os
+import csv
 import pandas as pd
 from datetime import datetime
 import streamlit as st
 from config import BANKS_FILE, BANK_TRANSACTIONS_FILE
+from utils import read_csv_cached, df_to_csv_bytes
 
-# Load or initialize bank accounts CSV
+BANK_COLUMNS = ["Bank Name", "Account Number", "Account Balance"]
+
+# Load or initialize bank accounts CSV, indexed by the unique account number
 def load_banks():
     if os.path.exists(BANKS_FILE):
-        return pd.read_csv(BANKS_FILE)
+        return read_csv_cached(BANKS_FILE, dtype={"Account Number": str}).set_index("Account Number")
     else:
-        bank_columns = ["Bank Name", "Account Number", "Account Balance"]
-        pd.DataFrame(columns=bank_columns).to_csv(BANKS_FILE, index=False)
-        return pd.DataFrame(columns=bank_columns)
+        pd.DataFrame(columns=BANK_COLUMNS).to_csv(BANKS_FILE, index=False)
+        return pd.DataFrame(columns=BANK_COLUMNS).set_index("Account Number")
 
 # Load or initialize transactions log CSV
 def load_bank_transactions():
     if os.path.exists(BANK_TRANSACTIONS_FILE):
-        return pd.read_csv(BANK_TRANSACTIONS_FILE)
+        return read_csv_cached(BANK_TRANSACTIONS_FILE, dtype={"Transaction Type": "category"})
     else:
         transaction_columns = ["Date", "From Bank", "To Bank", "Transaction Type", "Amount", "Description"]
         pd.DataFrame(columns=transaction_columns).to_csv(BANK_TRANSACTIONS_FILE, index=False)
@@ -42,11 +45,12 @@ def style_transaction_log(df):
 
 # Save bank accounts to CSV
 def save_banks(bank_df):
-    bank_df.to_csv(BANKS_FILE, index=False)
+    bank_df.reset_index()[BANK_COLUMNS].to_csv(BANKS_FILE, index=False)
 
-# Save bank transactions to CSV
-def save_transactions(transaction_df):
-    transaction_df.to_csv(BANK_TRANSACTIONS_FILE, index=False)
+# Append a single bank transaction to the CSV
+def append_transaction(transaction):
+    with open(BANK_TRANSACTIONS_FILE, 'a', newline='') as f:
+        csv.writer(f, lineterminator=os.linesep).writerow(transaction.values())
 
 # Bank Details UI
 def bank_details():
@@ -59,8 +63,13 @@ def bank_details():
     # Sidebar for debit/credit transactions
     st.sidebar.title("Transaction")
 
+    # Bank names may repeat, so accounts are picked by number and shown with their name
+    def account_label(account_number):
+        return f"{banks_df.at[account_number, 'Bank Name']} ({account_number})"
+
     if not banks_df.empty:
-        selected_bank = st.sidebar.selectbox("Select Bank", banks_df["Bank Name"])
+        selected_account = st.sidebar.selectbox("Select Bank", banks_df.index, format_func=account_label)
+        selected_bank = banks_df.at[selected_account, "Bank Name"]
         transaction_type = st.sidebar.radio("Transaction Type", ("Credit", "Debit"))
         amount = st.sidebar.number_input("Amount (₹)", min_value=0.0, step=0.1, key="transaction_amount")
         description = st.sidebar.text_input("Description (optional)", key="transaction_description")
@@ -69,36 +78,37 @@ def bank_details():
             if amount <= 0:
                 st.sidebar.error("Amount must be greater than 0!")
             else:
-                bank_balance = banks_df[banks_df["Bank Name"] == selected_bank]["Account Balance"].values[0]
+                bank_balance = banks_df.at[selected_account, "Account Balance"]
                 
                 if transaction_type == "Debit" and bank_balance < amount:
                     st.sidebar.error("Insufficient balance for this debit transaction!")
                 else:
                     # Update bank balance and log transaction
+                    current_datetime = datetime.now().isoformat(sep=" ", timespec="seconds")
                     if transaction_type == "Credit":
-                        banks_df.loc[banks_df["Bank Name"] == selected_bank, "Account Balance"] += amount
-                        new_transaction = pd.DataFrame({
-                            "Date": [datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
+                        banks_df.at[selected_account, "Account Balance"] += amount
+                        new_transaction = {
+                            "Date": current_datetime,
                             "From Bank": "External",
-                            "To Bank": [selected_bank],
-                            "Transaction Type": [transaction_type],
-                            "Amount": [amount],
-                            "Description": [description]
-                        })
+                            "To Bank": selected_bank,
+                            "Transaction Type": transaction_type,
+                            "Amount": amount,
+                            "Description": description
+                        }
                     else:  # Debit
-                        banks_df.loc[banks_df["Bank Name"] == selected_bank, "Account Balance"] -= amount
-                        new_transaction = pd.DataFrame({
-                            "Date": [datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                            "From Bank": [selected_bank],
+                        banks_df.at[selected_account, "Account Balance"] -= amount
+                        new_transaction = {
+                            "Date": current_datetime,
+                            "From Bank": selected_bank,
                             "To Bank": "External",
-                            "Transaction Type": [transaction_type],
-                            "Amount": [amount],
-                            "Description": [description]
-                        })
+                            "Transaction Type": transaction_type,
+                            "Amount": amount,
+                            "Description": description
+                        }
 
                     save_banks(banks_df)
-                    transactions_df = pd.concat([transactions_df, new_transaction], ignore_index=True)
-                    save_transactions(transactions_df)
+                    transactions_df.loc[len(transactions_df)] = new_transaction
+                    append_transaction(new_transaction)
                     st.sidebar.success(f"{transaction_type} of ₹{amount:,.2f} was successful for {selected_bank}")
     else:
         st.sidebar.info("No banks available. Please add a bank first.")
@@ -111,15 +121,13 @@ def bank_details():
 
         if st.button("Add Bank Account"):
             if bank_name and account_number and initial_balance >= 0:
-                if not banks_df[banks_df['Account Number'] == account_number].empty:
+                if account_number in banks_df.index:
                     st.error("Bank account with this number already exists!")
                 else:
-                    new_account = pd.DataFrame({
-                        "Bank Name": [bank_name],
-                        "Account Number": [account_number],
-                        "Account Balance": [initial_balance]
-                    })
-                    banks_df = pd.concat([banks_df, new_account], ignore_index=True)
+                    banks_df.loc[account_number] = {
+                        "Bank Name": bank_name,
+                        "Account Balance": initial_balance
+                    }
                     save_banks(banks_df)
                     st.success(f"Added bank account: {bank_name}")
             else:
@@ -128,10 +136,12 @@ def bank_details():
     # Self transfer money form
     with st.expander("➔ Self Transfer Money"):
         if not banks_df.empty:
-            from_bank = st.selectbox("From Bank", banks_df["Bank Name"])
-            to_bank = st.selectbox("To Bank", banks_df["Bank Name"])
+            from_account = st.selectbox("From Bank", banks_df.index, format_func=account_label)
+            to_account = st.selectbox("To Bank", banks_df.index, format_func=account_label)
+            from_bank = banks_df.at[from_account, "Bank Name"]
+            to_bank = banks_df.at[to_account, "Bank Name"]
 
-            if from_bank == to_bank:
+            if from_account == to_account:
                 st.error("Source and destination banks cannot be the same!")
             else:
                 amount = st.number_input("Amount (₹)", min_value=0.0, step=0.1, key="transfer_amount")
@@ -141,23 +151,23 @@ def bank_details():
                     if amount <= 0:
                         st.error("Transfer amount must be greater than 0!")
                     else:
-                        from_balance = banks_df[banks_df["Bank Name"] == from_bank]["Account Balance"].values[0]
+                        from_balance = banks_df.at[from_account, "Account Balance"]
 
                         if from_balance >= amount:
-                            banks_df.loc[banks_df["Bank Name"] == from_bank, "Account Balance"] -= amount
-                            banks_df.loc[banks_df["Bank Name"] == to_bank, "Account Balance"] += amount
+                            banks_df.at[from_account, "Account Balance"] -= amount
+                            banks_df.at[to_account, "Account Balance"] += amount
                             save_banks(banks_df)
 
-                            new_transaction = pd.DataFrame({
-                                "Date": [datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                                "From Bank": [from_bank],
-                                "To Bank": [to_bank],
+                            new_transaction = {
+                                "Date": datetime.now().isoformat(sep=" ", timespec="seconds"),
+                                "From Bank": from_bank,
+                                "To Bank": to_bank,
                                 "Transaction Type": "Self",
-                                "Amount": [amount],
-                                "Description": [description]
-                            })
-                            transactions_df = pd.concat([transactions_df, new_transaction], ignore_index=True)
-                            save_transactions(transactions_df)
+                                "Amount": amount,
+                                "Description": description
+                            }
+                            transactions_df.loc[len(transactions_df)] = new_transaction
+                            append_transaction(new_transaction)
                             st.success(f"Transferred ₹{amount:,.2f} from {from_bank} to {to_bank}")
                         else:
                             st.error("Insufficient balance in the source bank account!")
@@ -167,17 +177,19 @@ def bank_details():
     # Display bank accounts
     st.subheader("Your Bank Accounts")
     if not banks_df.empty:
-        st.dataframe(banks_df, use_container_width=True, hide_index=True)
+        st.dataframe(banks_df.reset_index()[BANK_COLUMNS], use_container_width=True, hide_index=True)
     else:
         st.info("No bank accounts added yet. Use the form above to add one.")
 
     # Display transaction log
     st.subheader("Transaction Log")
     if not transactions_df.empty:
-        st.dataframe(transactions_df.sort_values("Date", ascending=False), use_container_width=True, hide_index=True)
+        # Rows are appended in time order, so newest first is a reversed view
+        st.dataframe(transactions_df.iloc[::-1], use_container_width=True, hide_index=True)
+        transactions_stat = os.stat(BANK_TRANSACTIONS_FILE)
         st.download_button(
             label="Download Transaction Log as CSV",
-            data=transactions_df.to_csv(index=False),
+            data=df_to_csv_bytes(transactions_df, (transactions_stat.st_mtime_ns, transactions_stat.st_size)),
             file_name="bank_transactions.csv",
             mime="text/csv"
         )
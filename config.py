@@ -1,6 +1,6 @@
 # File paths
 STOCKS_FILE = "./data/stocks/available_stocks.json"
-CSV_FILE = "./data/stocks/stock_portfolio.csv"
+PORTFOLIO_FILE = "./data/stocks/stock_portfolio.parquet"
 TRANSACTION_LOG_FILE = "./data/stocks/transaction_log.csv"
 
 # File paths for bank details
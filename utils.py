@@ -0,0 +1,31 @@
+import os
+import pandas as pd
+import streamlit as st
+
+# Parse a CSV file once per version of its contents, evicting stale versions
+@st.cache_data(show_spinner=False, max_entries=8)
+def _read_csv_cached(path, mtime_ns, size, dtype):
+    return pd.read_csv(path, dtype=dtype)
+
+# Read a CSV file, reusing the parsed DataFrame until the file is modified;
+# pass the caller's os.stat result to key other caches on the same version of the file
+def read_csv_cached(path, dtype=None, stat=None):
+    if stat is None:
+        stat = os.stat(path)
+    return _read_csv_cached(path, stat.st_mtime_ns, stat.st_size, dtype)
+
+# Load a Parquet file once per version of its contents, evicting stale versions
+@st.cache_data(show_spinner=False, max_entries=2)
+def _read_parquet_cached(path, mtime_ns, size):
+    return pd.read_parquet(path, engine="pyarrow")
+
+# Read a Parquet file, reusing the loaded DataFrame until the file is modified
+def read_parquet_cached(path):
+    stat = os.stat(path)
+    return _read_parquet_cached(path, stat.st_mtime_ns, stat.st_size)
+
+# Serialize a DataFrame to CSV bytes for a download button once per cache key, evicting old keys;
+# the DataFrame is not hashed, so key must change whenever it does
+@st.cache_data(show_spinner=False, max_entries=4)
+def df_to_csv_bytes(_df, key):
+    return _df.to_csv(index=False).encode()